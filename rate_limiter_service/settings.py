@@ -26,6 +26,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'shortener.middleware.ClientIPMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,9 +59,27 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # keep connections open between requests instead of reconnecting each time
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# shared tier for the short code lookup cache (see shortener/views.py)
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = []
 
 LANGUAGE_CODE = 'en-us'
@@ -116,3 +135,16 @@ LOGGING = {
 # Rate Limiting Configuration
 RATE_LIMIT_REQUESTS = int(os.environ.get('RATE_LIMIT_REQUESTS', 5))
 RATE_LIMIT_WINDOW_SECONDS = int(os.environ.get('RATE_LIMIT_WINDOW_SECONDS', 60))
+
+# 'redis' = rolling window in Redis, 'memory' = per-process sliding window,
+# 'db' = fixed window counter in the database
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+RATE_LIMIT_BACKEND = os.environ.get(
+    'RATE_LIMIT_BACKEND', 'redis' if os.environ.get('REDIS_URL') else 'db'
+)
+
+# seconds between access_count flushes, 0 = update on every redirect
+ACCESS_COUNT_FLUSH_INTERVAL = float(os.environ.get('ACCESS_COUNT_FLUSH_INTERVAL', 2))
+
+# seconds browsers may cache a redirect (0 = no Cache-Control header)
+REDIRECT_CACHE_MAX_AGE = int(os.environ.get('REDIRECT_CACHE_MAX_AGE', 60))
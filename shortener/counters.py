@@ -0,0 +1,135 @@
+"""
+Buffered access counters for URLMapping.
+
+Redirects bump an in-memory counter instead of running an UPDATE inside the
+request. A daemon thread flushes pending counts every
+ACCESS_COUNT_FLUSH_INTERVAL seconds as one CASE/WHEN UPDATE per batch.
+Set the interval to 0 to write through on every bump.
+"""
+import atexit
+import logging
+import os
+import signal
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError, close_old_connections, models, transaction
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+# keeps each UPDATE well under SQLite's bound-parameter limit
+FLUSH_BATCH_SIZE = 500
+
+_PENDING = Counter()
+_LOCK = threading.Lock()
+_flusher_pid = None
+
+# ACCESS_COUNT_FLUSH_INTERVAL, read once instead of per redirect
+_INTERVAL_CACHE = [None]
+
+
+def _get_interval():
+    interval = _INTERVAL_CACHE[0]
+    if interval is None:
+        interval = _INTERVAL_CACHE[0] = getattr(settings, 'ACCESS_COUNT_FLUSH_INTERVAL', 2)
+    return interval
+
+
+@receiver(setting_changed)
+def _reset_interval(setting, **kwargs):
+    # keeps override_settings working in tests
+    if setting == 'ACCESS_COUNT_FLUSH_INTERVAL':
+        _INTERVAL_CACHE[0] = None
+
+
+def bump(pk):
+    """Record one access for the URLMapping with this pk."""
+    interval = _get_interval()
+    if not interval:
+        _write({pk: 1})
+        return
+
+    with _LOCK:
+        _PENDING[pk] += 1
+    if _flusher_pid != os.getpid():
+        _start_flusher(interval)
+
+
+def flush():
+    """Write all pending counts to the DB. Counts are kept if the write fails."""
+    with _LOCK:
+        if not _PENDING:
+            return
+        snapshot = _PENDING.copy()
+        _PENDING.clear()
+
+    try:
+        _write(snapshot)
+    except DatabaseError as e:
+        logger.error(f"Failed to flush access counts: {e}")
+        with _LOCK:
+            _PENDING.update(snapshot)
+
+
+def _write(counts):
+    pks = list(counts)
+    if len(pks) <= FLUSH_BATCH_SIZE:
+        _update_batch(pks, counts)
+        return
+    with transaction.atomic():
+        for i in range(0, len(pks), FLUSH_BATCH_SIZE):
+            _update_batch(pks[i:i + FLUSH_BATCH_SIZE], counts)
+
+
+def _update_batch(pks, counts):
+    from .models import URLMapping
+
+    URLMapping.objects.filter(pk__in=pks).update(
+        access_count=models.Case(
+            *[
+                models.When(pk=pk, then=models.F('access_count') + counts[pk])
+                for pk in pks
+            ],
+            default=models.F('access_count'),
+            output_field=models.PositiveIntegerField(),
+        )
+    )
+
+
+def _run(interval):
+    while True:
+        time.sleep(interval)
+        # the thread must survive any error, bump() won't start another one
+        try:
+            close_old_connections()
+            flush()
+        except Exception:
+            logger.exception("Access count flusher failed")
+
+
+def _exit_on_sigterm(signum, frame):
+    # turn the default hard kill into a normal exit so the atexit flush runs
+    raise SystemExit(128 + signum)
+
+
+def _start_flusher(interval):
+    global _flusher_pid
+    with _LOCK:
+        # pid check so forked workers start their own thread
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+
+    threading.Thread(
+        target=_run, args=(interval,), name='access-count-flusher', daemon=True
+    ).start()
+    atexit.register(flush)
+
+    # servers like gunicorn install their own graceful SIGTERM handling
+    if (threading.current_thread() is threading.main_thread()
+            and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL):
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
@@ -0,0 +1,29 @@
+import ipaddress
+
+
+def parse_client_ip(meta):
+    """
+    First X-Forwarded-For hop if it is a valid IP, otherwise REMOTE_ADDR.
+    Malformed XFF values are ignored so they can't be used to mint fresh
+    rate limit keys.
+    """
+    xff = meta.get('HTTP_X_FORWARDED_FOR')
+    if xff:
+        ip = xff.partition(',')[0].strip()
+        try:
+            ipaddress.ip_address(ip)
+            return ip
+        except ValueError:
+            pass
+    return meta.get('REMOTE_ADDR', 'unknown')
+
+
+class ClientIPMiddleware:
+    """Resolve the client IP once per request and store it on request.client_ip."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.client_ip = parse_client_ip(request.META)
+        return self.get_response(request)
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+INDEX_NAME = 'shortener_urlmapping_short_code_covering'
+
+
+def create_covering_index(apps, schema_editor):
+    # Redirects read (id, original_url) by short_code, so with both columns in
+    # the index the lookup is an index-only scan.
+    # INCLUDE is Postgres-only; on other backends the unique index on
+    # short_code is all we get.
+    # btree entries are capped at ~2.7kB; check_url limits original_url to
+    # URL_MAX_BYTES so every row fits.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} '
+        'ON shortener_urlmapping (short_code) INCLUDE (id, original_url)'
+    )
+
+
+def drop_covering_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    # CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('shortener', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_covering_index, drop_covering_index),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-15 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shortener', '0002_urlmapping_covering_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='ratelimitrecord',
+            name='shortener_r_ip_addr_44c251_idx',
+        ),
+        migrations.AlterField(
+            model_name='ratelimitrecord',
+            name='ip_address',
+            field=models.CharField(max_length=45, unique=True),
+        ),
+    ]
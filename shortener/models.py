@@ -1,13 +1,16 @@
-import string
-import random
-from django.db import models
+import secrets
+from datetime import timedelta, timezone as dt_timezone
+from django.db import IntegrityError, connection, models, transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters
 
 
 def generate_short_code(length=6):
-    """Generate random alphanumeric code for shortened URLs."""
-    chars = string.ascii_letters + string.digits
-    return ''.join(random.choices(chars, k=length))
+    """Generate random URL-safe code ([A-Za-z0-9_-]) for shortened URLs."""
+    # n random bytes encode to at least n base64 chars
+    return secrets.token_urlsafe(length)[:length]
 
 
 class URLMapping(models.Model):
@@ -25,22 +28,22 @@ class URLMapping(models.Model):
         return f"{self.short_code} -> {self.original_url[:50]}"
 
     def save(self, *args, **kwargs):
-        if not self.short_code:
-            # try a few times to get a unique code
-            for _ in range(10):
-                code = generate_short_code()
-                if not URLMapping.objects.filter(short_code=code).exists():
-                    self.short_code = code
-                    break
-            else:
-                # fallback to longer code
-                self.short_code = generate_short_code(length=10)
-        super().save(*args, **kwargs)
+        if self.short_code:
+            return super().save(*args, **kwargs)
+
+        # let the unique index catch collisions instead of probing first
+        for attempt in range(5):
+            self.short_code = generate_short_code(length=6 if attempt < 3 else 10)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.short_code = ''
+        raise IntegrityError("Could not generate a unique short code")
 
     def increment_access_count(self):
-        URLMapping.objects.filter(pk=self.pk).update(
-            access_count=models.F('access_count') + 1
-        )
+        # buffered, see counters.py
+        counters.bump(self.pk)
 
 
 class RateLimitRecord(models.Model):
@@ -48,15 +51,11 @@ class RateLimitRecord(models.Model):
     Tracks request counts per IP for rate limiting (fixed window approach).
     """
     
-    ip_address = models.CharField(max_length=45, unique=True, db_index=True)
+    # unique=True already gives the only index lookups need
+    ip_address = models.CharField(max_length=45, unique=True)
     window_start = models.DateTimeField()
     request_count = models.PositiveIntegerField(default=0)
 
-    class Meta:
-        indexes = [
-            models.Index(fields=['ip_address', 'window_start']),
-        ]
-
     def __str__(self):
         return f"{self.ip_address}: {self.request_count} reqs"
 
@@ -65,40 +64,53 @@ class RateLimitRecord(models.Model):
         """
         Check if request is allowed under the rate limit.
         Returns dict with allowed, remaining, retry_after, current_count.
+
+        One INSERT ... ON CONFLICT DO UPDATE ... RETURNING statement
+        (Postgres, SQLite 3.35+) so the window reset, limit check and
+        increment happen atomically in a single round-trip.
         """
         now = timezone.now()
-        
-        record, created = cls.objects.get_or_create(
-            ip_address=ip_address,
-            defaults={'window_start': now, 'request_count': 0}
-        )
-        
-        elapsed = (now - record.window_start).total_seconds()
-        
-        # reset window if expired
-        if elapsed >= window_seconds:
-            record.window_start = now
-            record.request_count = 0
-            elapsed = 0
-        
-        if record.request_count < limit:
-            # atomic increment
-            record.request_count = models.F('request_count') + 1
-            record.save(update_fields=['window_start', 'request_count'])
-            record.refresh_from_db()
-            
+        cutoff = now - timedelta(seconds=window_seconds)
+        table = connection.ops.quote_name(cls._meta.db_table)
+
+        # count stops at limit + 1 so a blocked IP doesn't keep growing
+        sql = f"""
+            INSERT INTO {table} (ip_address, window_start, request_count)
+            VALUES (%s, %s, 1)
+            ON CONFLICT (ip_address) DO UPDATE SET
+                window_start = CASE WHEN {table}.window_start <= %s
+                    THEN EXCLUDED.window_start ELSE {table}.window_start END,
+                request_count = CASE
+                    WHEN {table}.window_start <= %s THEN 1
+                    WHEN {table}.request_count < %s THEN {table}.request_count + 1
+                    ELSE %s END
+            RETURNING request_count, window_start
+        """
+        db_now = connection.ops.adapt_datetimefield_value(now)
+        db_cutoff = connection.ops.adapt_datetimefield_value(cutoff)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [ip_address, db_now, db_cutoff, db_cutoff, limit, limit + 1])
+            request_count, window_start = cursor.fetchone()
+
+        if request_count <= limit:
             return {
                 'allowed': True,
-                'remaining': max(0, limit - record.request_count),
+                'remaining': limit - request_count,
                 'retry_after': 0,
-                'current_count': record.request_count
+                'current_count': request_count
             }
-        
+
         # rate limited
+        if isinstance(window_start, str):
+            # sqlite hands back the raw column value
+            window_start = parse_datetime(window_start)
+        if timezone.is_naive(window_start):
+            window_start = timezone.make_aware(window_start, dt_timezone.utc)
+        elapsed = (now - window_start).total_seconds()
         retry_after = max(1, int(window_seconds - elapsed))
         return {
             'allowed': False,
             'remaining': 0,
             'retry_after': retry_after,
-            'current_count': record.request_count
+            'current_count': limit
         }
@@ -1,12 +1,48 @@
 """
-Custom rate limiter using fixed window algorithm.
-Stores counters in the database - for higher scale, swap to Redis.
+Custom rate limiter.
+
+RATE_LIMIT_BACKEND picks where counters live:
+- 'redis': rolling window in a Redis sorted set (rate_limiter_redis.py)
+- 'memory': per-process sliding window of 1s buckets (slidingwindow.py)
+- 'db': fixed window counter stored in the database
 """
+import time
 from dataclasses import dataclass
+from uuid import uuid4
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from . import slidingwindow
+from .middleware import parse_client_ip
 from .models import RateLimitRecord
 
 
+# (limit, window_seconds, backend), read once instead of per request
+_SETTINGS_CACHE = [None]
+_CACHED_SETTINGS = frozenset({
+    'RATE_LIMIT_REQUESTS', 'RATE_LIMIT_WINDOW_SECONDS', 'RATE_LIMIT_BACKEND',
+})
+
+
+def _get_limits():
+    cached = _SETTINGS_CACHE[0]
+    if cached is None:
+        cached = _SETTINGS_CACHE[0] = (
+            getattr(settings, 'RATE_LIMIT_REQUESTS', 5),
+            getattr(settings, 'RATE_LIMIT_WINDOW_SECONDS', 60),
+            getattr(settings, 'RATE_LIMIT_BACKEND', 'db'),
+        )
+    return cached
+
+
+@receiver(setting_changed)
+def _reset_limits(setting, **kwargs):
+    # keeps override_settings working in tests
+    if setting in _CACHED_SETTINGS:
+        _SETTINGS_CACHE[0] = None
+
+
 @dataclass
 class RateLimitResult:
     allowed: bool
@@ -17,30 +53,57 @@ class RateLimitResult:
 
 
 def get_client_ip(request):
-    """Get client IP, handling proxies."""
-    xff = request.META.get('HTTP_X_FORWARDED_FOR')
-    if xff:
-        return xff.split(',')[0].strip()
-    return request.META.get('REMOTE_ADDR', 'unknown')
+    """Get client IP, handling proxies. Normally resolved by ClientIPMiddleware."""
+    ip = getattr(request, 'client_ip', None)
+    if ip:
+        return ip
+    return parse_client_ip(request.META)
+
+
+def uses_db_backend():
+    """True when counters live in RateLimitRecord rather than Redis/memory."""
+    return _get_limits()[2] == 'db'
 
 
 def check_rate_limit(request, limit=None, window_seconds=None):
     """
     Check if request is within rate limits.
-    Uses fixed window counter stored in DB.
+    Dispatches to the backend named by RATE_LIMIT_BACKEND.
     """
+    default_limit, default_window, backend = _get_limits()
     if limit is None:
-        limit = getattr(settings, 'RATE_LIMIT_REQUESTS', 5)
+        limit = default_limit
     if window_seconds is None:
-        window_seconds = getattr(settings, 'RATE_LIMIT_WINDOW_SECONDS', 60)
+        window_seconds = default_window
     
     ip = get_client_ip(request)
-    result = RateLimitRecord.check_and_increment(ip, limit, window_seconds)
-    
+
+    if backend == 'db':
+        result = RateLimitRecord.check_and_increment(ip, limit, window_seconds)
+        return RateLimitResult(
+            allowed=result['allowed'],
+            remaining=result['remaining'],
+            retry_after=result['retry_after'],
+            limit=limit,
+            window_seconds=window_seconds
+        )
+
+    if backend == 'memory':
+        allowed, remaining, retry_after = slidingwindow.check_and_increment(
+            ip, limit, window_seconds
+        )
+    else:
+        # imported lazily so the other backends work without redis installed
+        from .rate_limiter_redis import rate_limit_key, rolling_window
+
+        allowed, remaining, retry_after = rolling_window(
+            keys=[rate_limit_key(ip)],
+            args=[int(time.time() * 1000), window_seconds, limit, uuid4().hex]
+        )
     return RateLimitResult(
-        allowed=result['allowed'],
-        remaining=result['remaining'],
-        retry_after=result['retry_after'],
+        allowed=bool(allowed),
+        remaining=int(remaining),
+        retry_after=int(retry_after),
         limit=limit,
         window_seconds=window_seconds
     )
@@ -0,0 +1,37 @@
+"""
+Rolling window rate limiter backed by a Redis sorted set.
+
+Each IP gets a ZSET of request timestamps (ms). A single Lua script trims
+entries older than the window, counts what is left and records the new
+request, so every check is one atomic round-trip to Redis.
+"""
+from django.conf import settings
+import redis
+
+client = redis.Redis.from_url(getattr(settings, 'REDIS_URL', 'redis://localhost:6379/0'))
+
+# KEYS[1] = rl:<ip>
+# ARGV = now_ms, window_seconds, limit, unique member suffix
+# returns {allowed, remaining, retry_after}
+ROLLING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local win = tonumber(ARGV[2])
+local lim = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - win * 1000)
+local c = redis.call('ZCARD', KEYS[1])
+if c < lim then
+    redis.call('ZADD', KEYS[1], now, now .. ':' .. ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], win * 1000)
+    return {1, lim - c - 1, 0}
+else
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return {0, 0, math.ceil((oldest[2] + win * 1000 - now) / 1000)}
+end
+"""
+
+# register_script sends EVALSHA and falls back to SCRIPT LOAD on NOSCRIPT
+rolling_window = client.register_script(ROLLING_WINDOW_LUA)
+
+
+def rate_limit_key(ip_address):
+    return f"rl:{ip_address}"
@@ -1,37 +1,162 @@
 import re
+from collections.abc import Mapping
 from urllib.parse import urlparse
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import ProhibitNullCharactersValidator, URLValidator
 from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.fields import ProhibitSurrogateCharactersValidator
+from rest_framework.settings import api_settings
 from .models import URLMapping
 
+URL_MAX_LENGTH = 2048
+# keeps the Postgres covering index entry (migration 0002) under the ~2.7kB
+# btree limit even for URLs full of multi-byte characters
+URL_MAX_BYTES = 2048
+_ALLOWED_SCHEMES = frozenset({'http', 'https'})
+_BLOCKED_HOSTS = frozenset({'localhost', '127.0.0.1', '0.0.0.0', '::1'})
+_IPV4_RE = re.compile(r'^(?:\d{1,3}\.){3}\d{1,3}$')
+
+# (network, mask) pairs, IPv4 packed as uint32
+_BLOCKED_V4_NETS = (
+    (0x00000000, 0xFF000000),  # 0.0.0.0/8
+    (0x0A000000, 0xFF000000),  # 10.0.0.0/8
+    (0x64400000, 0xFFC00000),  # 100.64.0.0/10 (CGNAT)
+    (0x7F000000, 0xFF000000),  # 127.0.0.0/8
+    (0xA9FE0000, 0xFFFF0000),  # 169.254.0.0/16 (link-local)
+    (0xAC100000, 0xFFF00000),  # 172.16.0.0/12
+    (0xC0000000, 0xFFFFFF00),  # 192.0.0.0/24
+    (0xC0000200, 0xFFFFFF00),  # 192.0.2.0/24 (TEST-NET-1)
+    (0xC0A80000, 0xFFFF0000),  # 192.168.0.0/16
+    (0xC6120000, 0xFFFE0000),  # 198.18.0.0/15
+    (0xC6336400, 0xFFFFFF00),  # 198.51.100.0/24 (TEST-NET-2)
+    (0xCB007100, 0xFFFFFF00),  # 203.0.113.0/24 (TEST-NET-3)
+    (0xF0000000, 0xF0000000),  # 240.0.0.0/4 (reserved + broadcast)
+)
+
+
+# same validator chain as serializers.URLField
+_prohibit_null_characters = ProhibitNullCharactersValidator()
+_prohibit_surrogate_characters = ProhibitSurrogateCharactersValidator()
+_url_validator = URLValidator()
+_created_at_field = serializers.DateTimeField()
+
+
+def check_url(value):
+    """Shortener rules on top of plain URL validation."""
+    if len(value.encode('utf-8')) > URL_MAX_BYTES:
+        raise serializers.ValidationError(
+            f"URL must be at most {URL_MAX_BYTES} bytes when UTF-8 encoded."
+        )
+
+    parsed = urlparse(value)
+    
+    if parsed.scheme not in _ALLOWED_SCHEMES:
+        raise serializers.ValidationError("Only http/https URLs allowed.")
+    
+    if not parsed.netloc:
+        raise serializers.ValidationError("Invalid URL.")
+    
+    # block localhost
+    host = parsed.hostname or ''
+    if host in _BLOCKED_HOSTS:
+        raise serializers.ValidationError("Localhost URLs not allowed.")
+    
+    # block private IPs
+    if _IPV4_RE.match(host):
+        try:
+            ip32 = int.from_bytes(bytes(int(x) for x in host.split('.')), 'big')
+        except ValueError:
+            # octet > 255
+            raise serializers.ValidationError("Invalid URL.")
+        if any(ip32 & mask == net for net, mask in _BLOCKED_V4_NETS):
+            raise serializers.ValidationError("Private IPs not allowed.")
+    
+    return value
+
+
+def _url_error(message, code='invalid'):
+    return serializers.ValidationError({'url': [message]}, code=code)
+
+
+def validate_shorten_request(data):
+    """
+    Hot-path equivalent of ShortenURLRequestSerializer(data=data).is_valid().
+    Same rules and error shape, without building a serializer per request.
+    Returns the cleaned url or raises ValidationError.
+    """
+    if not isinstance(data, Mapping):
+        raise serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                f'Invalid data. Expected a dictionary, but got {type(data).__name__}.'
+            ]
+        }, code='invalid')
+    if 'url' not in data:
+        raise _url_error('This field is required.', 'required')
+
+    value = data['url']
+    if value is None:
+        raise _url_error('This field may not be null.', 'null')
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        # URLField overrides CharField's 'invalid' message
+        raise _url_error('Enter a valid URL.')
+    value = str(value).strip()
+    if not value:
+        raise _url_error('This field may not be blank.', 'blank')
+
+    # like DRF, report every failing validator, not just the first
+    errors = []
+    if len(value) > URL_MAX_LENGTH:
+        errors.append(ErrorDetail(
+            f'Ensure this field has no more than {URL_MAX_LENGTH} characters.', code='max_length'
+        ))
+    try:
+        _prohibit_null_characters(value)
+    except DjangoValidationError as e:
+        errors.append(ErrorDetail(e.messages[0], code=e.code))
+    try:
+        _prohibit_surrogate_characters(value)
+    except serializers.ValidationError as e:
+        errors.extend(e.detail)
+    try:
+        _url_validator(value)
+    except DjangoValidationError:
+        errors.append(ErrorDetail('Enter a valid URL.', code='invalid'))
+    if errors:
+        raise serializers.ValidationError({'url': errors})
+
+    try:
+        return check_url(value)
+    except serializers.ValidationError as e:
+        raise serializers.ValidationError({'url': e.detail})
+
+
+def short_url_for(request, short_code):
+    if not request:
+        return f'/{short_code}'
+    # short codes are URL-safe, so skip build_absolute_uri's parsing/quoting
+    base_uri = getattr(request, '_base_uri', None)
+    if base_uri is None:
+        base_uri = request._base_uri = f'{request.scheme}://{request.get_host()}'
+    return f'{base_uri}/{short_code}'
+
+
+def shorten_response_data(url_mapping, request):
+    """Same payload as ShortenURLResponseSerializer, built as a plain dict."""
+    return {
+        'short_code': url_mapping.short_code,
+        'short_url': short_url_for(request, url_mapping.short_code),
+        'original_url': url_mapping.original_url,
+        'created_at': _created_at_field.to_representation(url_mapping.created_at),
+    }
+
 
 class ShortenURLRequestSerializer(serializers.Serializer):
-    url = serializers.URLField(max_length=2048)
+    """Kept for schema/docs; ShortenURLView uses validate_shorten_request()."""
+    url = serializers.URLField(max_length=URL_MAX_LENGTH)
 
     def validate_url(self, value):
-        parsed = urlparse(value)
-        
-        if parsed.scheme not in ('http', 'https'):
-            raise serializers.ValidationError("Only http/https URLs allowed.")
-        
-        if not parsed.netloc:
-            raise serializers.ValidationError("Invalid URL.")
-        
-        # block localhost
-        host = parsed.netloc.split(':')[0]
-        if host in ('localhost', '127.0.0.1', '0.0.0.0'):
-            raise serializers.ValidationError("Localhost URLs not allowed.")
-        
-        # block private IPs
-        if re.match(r'^(\d{1,3}\.){3}\d{1,3}$', host):
-            parts = [int(x) for x in host.split('.')]
-            if parts[0] == 10:
-                raise serializers.ValidationError("Private IPs not allowed.")
-            if parts[0] == 172 and 16 <= parts[1] <= 31:
-                raise serializers.ValidationError("Private IPs not allowed.")
-            if parts[0] == 192 and parts[1] == 168:
-                raise serializers.ValidationError("Private IPs not allowed.")
-        
-        return value
+        return check_url(value)
 
 
 class ShortenURLResponseSerializer(serializers.ModelSerializer):
@@ -42,7 +167,4 @@ class ShortenURLResponseSerializer(serializers.ModelSerializer):
         fields = ['short_code', 'short_url', 'original_url', 'created_at']
 
     def get_short_url(self, obj):
-        request = self.context.get('request')
-        if request:
-            return request.build_absolute_uri(f'/{obj.short_code}')
-        return f'/{obj.short_code}'
+        return short_url_for(self.context.get('request'), obj.short_code)
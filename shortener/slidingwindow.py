@@ -0,0 +1,71 @@
+"""
+In-process sliding window rate limiter (BucketTimeRateLimit style).
+
+Each IP gets a ring of per-second buckets spanning the window and the rolling
+count is their sum, so there's no 2x burst at window edges and no DB or Redis
+round-trip. Counters live in this process only - use the Redis backend when
+running several workers.
+"""
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+SHARD_COUNT = 16  # power of two, shard = hash(ip) & (SHARD_COUNT - 1)
+MAX_TRACKED_IPS = 100_000
+
+
+class _Shard:
+    __slots__ = ('lock', 'entries')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # ip -> [buckets, last_second], least recently seen first
+        self.entries = OrderedDict()
+
+
+_SHARDS = [_Shard() for _ in range(SHARD_COUNT)]
+_MAX_PER_SHARD = MAX_TRACKED_IPS // SHARD_COUNT
+
+
+def check_and_increment(ip_address, limit, window_seconds):
+    """
+    Count a request for ip_address if it fits in the rolling window.
+    Returns (allowed, remaining, retry_after).
+    """
+    now = int(time.monotonic())
+    shard = _SHARDS[hash(ip_address) & (SHARD_COUNT - 1)]
+
+    with shard.lock:
+        entry = shard.entries.get(ip_address)
+        if entry is None or len(entry[0]) != window_seconds:
+            entry = [array('I', [0]) * window_seconds, now]
+            shard.entries[ip_address] = entry
+            if len(shard.entries) > _MAX_PER_SHARD:
+                shard.entries.popitem(last=False)
+        else:
+            shard.entries.move_to_end(ip_address)
+
+        buckets, last = entry
+        # zero the buckets for seconds that passed since the last request
+        if now - last >= window_seconds:
+            for i in range(window_seconds):
+                buckets[i] = 0
+        else:
+            for second in range(last + 1, now + 1):
+                buckets[second % window_seconds] = 0
+        entry[1] = now
+
+        total = sum(buckets)
+        if total < limit:
+            buckets[now % window_seconds] += 1
+            return True, limit - total - 1, 0
+
+        # wait until enough of the oldest seconds slide out of the window
+        retry_after = window_seconds
+        for i in range(1, window_seconds + 1):
+            total -= buckets[(now - window_seconds + i) % window_seconds]
+            if total < limit:
+                retry_after = i
+                break
+        return False, 0, retry_after
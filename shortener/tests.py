@@ -8,17 +8,29 @@ Tests cover:
 - Error handling
 - Edge cases
 """
-from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from unittest.mock import patch
 from datetime import timedelta
 from django.utils import timezone
 
-from .models import URLMapping, RateLimitRecord
+from . import counters, slidingwindow, views
+from .models import URLMapping, RateLimitRecord, generate_short_code
+from .serializers import (
+    ShortenURLRequestSerializer,
+    ShortenURLResponseSerializer,
+    short_url_for,
+    shorten_response_data,
+    validate_shorten_request,
+)
 
 
+@override_settings(ACCESS_COUNT_FLUSH_INTERVAL=0)
 class URLMappingModelTests(TestCase):
     """Tests for URLMapping model."""
 
@@ -45,6 +57,20 @@ class URLMappingModelTests(TestCase):
         mapping.refresh_from_db()
         self.assertEqual(mapping.access_count, 1)
 
+    def test_generate_short_code_is_url_safe(self):
+        """Generated codes have the requested length and a URL-safe alphabet."""
+        for length in (6, 10):
+            code = generate_short_code(length)
+            self.assertEqual(len(code), length)
+            self.assertRegex(code, r'^[A-Za-z0-9_-]+$')
+
+    def test_short_code_collision_retries(self):
+        """A colliding generated code is replaced with a fresh one."""
+        URLMapping.objects.create(original_url="https://example.com/1", short_code="taken1")
+        with patch('shortener.models.generate_short_code', side_effect=['taken1', 'fresh1']):
+            mapping = URLMapping.objects.create(original_url="https://example.com/2")
+        self.assertEqual(mapping.short_code, "fresh1")
+
     def test_custom_short_code_preserved(self):
         """Custom short code is preserved when provided."""
         mapping = URLMapping.objects.create(
@@ -84,6 +110,17 @@ class RateLimitRecordModelTests(TestCase):
         )
         self.assertFalse(result['allowed'])
         self.assertGreater(result['retry_after'], 0)
+        self.assertLessEqual(result['retry_after'], 60)
+        self.assertEqual(RateLimitRecord.objects.get(ip_address=ip).request_count, 6)
+
+    def test_check_and_increment_single_query(self):
+        """Each check is one statement, with no read-back after the update."""
+        ip = "192.168.1.4"
+        for _ in range(6):
+            with self.assertNumQueries(1):
+                RateLimitRecord.check_and_increment(
+                    ip_address=ip, limit=5, window_seconds=60
+                )
 
     def test_window_reset_allows_new_requests(self):
         """After window expires, new requests are allowed."""
@@ -102,6 +139,94 @@ class RateLimitRecordModelTests(TestCase):
             ip_address=ip, limit=5, window_seconds=60
         )
         self.assertTrue(result['allowed'])
+        self.assertEqual(result['current_count'], 1)
+        record.refresh_from_db()
+        self.assertGreater(record.window_start, old_time)
+
+
+@override_settings(RATE_LIMIT_BACKEND='redis')
+class RedisRateLimiterTests(APITestCase):
+    """Tests for the Redis rolling window backend (script mocked)."""
+
+    def test_allowed_request_uses_ip_key(self):
+        """Script is called with the per-IP key and limit args."""
+        with patch('shortener.rate_limiter_redis.rolling_window',
+                   return_value=[1, 4, 0]) as script:
+            response = self.client.post(
+                '/shorten',
+                {'url': 'https://example.com'},
+                format='json',
+                REMOTE_ADDR='203.0.113.7'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response['X-RateLimit-Remaining'], '4')
+        kwargs = script.call_args.kwargs
+        self.assertEqual(kwargs['keys'], ['rl:203.0.113.7'])
+        self.assertEqual(kwargs['args'][1:3], [60, 5])
+        self.assertFalse(RateLimitRecord.objects.exists())
+
+    def test_denied_request_returns_429(self):
+        """Denied result from the script maps to a 429 with Retry-After."""
+        with patch('shortener.rate_limiter_redis.rolling_window',
+                   return_value=[0, 0, 17]), self.assertNumQueries(0):
+            response = self.client.post(
+                '/shorten',
+                {'url': 'https://example.com'},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '17')
+        self.assertEqual(response.data['retry_after'], 17)
+
+
+@patch('shortener.slidingwindow.time.monotonic')
+class SlidingWindowTests(TestCase):
+    """Tests for the in-process sliding window backend."""
+
+    def setUp(self):
+        for shard in slidingwindow._SHARDS:
+            shard.entries.clear()
+
+    def test_blocks_over_limit_and_reports_retry_after(self, monotonic):
+        """Requests past the limit are blocked until the oldest slide out."""
+        monotonic.return_value = 1000.0
+        slidingwindow.check_and_increment('10.1.1.1', 3, 60)
+        monotonic.return_value = 1010.0
+        for _ in range(2):
+            allowed, remaining, _ = slidingwindow.check_and_increment('10.1.1.1', 3, 60)
+        self.assertTrue(allowed)
+        self.assertEqual(remaining, 0)
+
+        monotonic.return_value = 1030.0
+        allowed, remaining, retry_after = slidingwindow.check_and_increment('10.1.1.1', 3, 60)
+        self.assertFalse(allowed)
+        # the request from t=1000 leaves the window at t=1060
+        self.assertEqual(retry_after, 30)
+
+    def test_no_burst_at_window_boundary(self, monotonic):
+        """Unlike a fixed window, crossing a boundary doesn't reset the count."""
+        monotonic.return_value = 1059.0
+        for _ in range(3):
+            slidingwindow.check_and_increment('10.1.1.2', 3, 60)
+        monotonic.return_value = 1061.0
+        allowed, _, _ = slidingwindow.check_and_increment('10.1.1.2', 3, 60)
+        self.assertFalse(allowed)
+
+        monotonic.return_value = 1119.0
+        allowed, remaining, _ = slidingwindow.check_and_increment('10.1.1.2', 3, 60)
+        self.assertTrue(allowed)
+        self.assertEqual(remaining, 2)
+
+    @override_settings(RATE_LIMIT_BACKEND='memory', RATE_LIMIT_REQUESTS=1)
+    def test_memory_backend_skips_db(self, monotonic):
+        """The memory backend never writes RateLimitRecord rows."""
+        monotonic.return_value = 1000.0
+        self.client.post('/shorten', {'url': 'https://example.com'}, content_type='application/json')
+        response = self.client.post(
+            '/shorten', {'url': 'https://example.com'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(RateLimitRecord.objects.exists())
 
 
 class ShortenURLViewTests(APITestCase):
@@ -143,6 +268,16 @@ class ShortenURLViewTests(APITestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_malformed_json_counts_toward_rate_limit(self):
+        """Unparseable bodies are rejected but still use up the limit."""
+        for _ in range(2):
+            response = self.client.post(
+                '/shorten', '{bad', content_type='application/json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('X-RateLimit-Remaining', response)
+        self.assertEqual(RateLimitRecord.objects.get().request_count, 2)
+
     def test_rate_limit_headers_present(self):
         """Rate limit headers are included in response."""
         response = self.client.post(
@@ -154,6 +289,14 @@ class ShortenURLViewTests(APITestCase):
         self.assertIn('X-RateLimit-Remaining', response)
         self.assertIn('X-RateLimit-Reset', response)
 
+    def test_rate_limit_settings_follow_override(self):
+        """Cached limits are refreshed when settings change."""
+        with override_settings(RATE_LIMIT_REQUESTS=7):
+            response = self.client.post('/shorten', {'url': 'https://example.com'}, format='json')
+            self.assertEqual(response['X-RateLimit-Limit'], '7')
+        response = self.client.post('/shorten', {'url': 'https://example.com'}, format='json')
+        self.assertEqual(response['X-RateLimit-Limit'], '5')
+
     @override_settings(RATE_LIMIT_REQUESTS=3, RATE_LIMIT_WINDOW_SECONDS=60)
     def test_rate_limit_exceeded(self):
         """Rate limit returns 429 after limit exceeded."""
@@ -181,9 +324,14 @@ class ShortenURLViewTests(APITestCase):
         self.assertIn('retry_after', response.data)
 
 
+@override_settings(ACCESS_COUNT_FLUSH_INTERVAL=0)
 class RedirectViewTests(APITestCase):
     """Tests for GET /{short_code} endpoint."""
 
+    def setUp(self):
+        views._URL_CACHE.clear()
+        cache.clear()
+
     def test_redirect_valid_code(self):
         """Valid short code redirects to original URL."""
         mapping = URLMapping.objects.create(
@@ -192,11 +340,47 @@ class RedirectViewTests(APITestCase):
         response = self.client.get(f'/{mapping.short_code}')
         self.assertEqual(response.status_code, status.HTTP_302_FOUND)
         self.assertEqual(response['Location'], 'https://www.google.com')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(REDIRECT_CACHE_MAX_AGE=60)
+    def test_redirect_cache_control(self):
+        """Redirects are cacheable by the browser for REDIRECT_CACHE_MAX_AGE."""
+        mapping = URLMapping.objects.create(original_url="https://example.com")
+        response = self.client.get(f'/{mapping.short_code}')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=60')
+
+        with override_settings(REDIRECT_CACHE_MAX_AGE=0):
+            response = self.client.get(f'/{mapping.short_code}')
+        self.assertNotIn('Cache-Control', response)
 
     def test_redirect_invalid_code(self):
         """Invalid short code returns 404."""
         response = self.client.get('/nonexistent123')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {'detail': 'Not found.'})
+
+    def test_redirect_survives_shared_cache_outage(self):
+        """Shared cache errors fall back to the DB lookup."""
+        mapping = URLMapping.objects.create(original_url="https://example.com/up")
+        with patch('shortener.views.cache.get', side_effect=ConnectionError('down')), \
+                patch('shortener.views.cache.set', side_effect=ConnectionError('down')):
+            response = self.client.get(f'/{mapping.short_code}')
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(response['Location'], 'https://example.com/up')
+
+    def test_redirect_db_error_returns_503(self):
+        """DB failures return the same 503 body as the DRF views."""
+        with patch('shortener.views.resolve_short_code', side_effect=DatabaseError('down')):
+            response = self.client.get('/abc123')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json(), {'error': 'Database unavailable'})
+
+    def test_redirect_db_error_on_access_count_returns_503(self):
+        """Write-through access count failures are handled the same way."""
+        mapping = URLMapping.objects.create(original_url="https://example.com")
+        with patch('shortener.counters.bump', side_effect=DatabaseError('down')):
+            response = self.client.get(f'/{mapping.short_code}')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
 
     def test_redirect_increments_access_count(self):
         """Redirect increments the access counter."""
@@ -210,6 +394,104 @@ class RedirectViewTests(APITestCase):
         mapping.refresh_from_db()
         self.assertEqual(mapping.access_count, 1)
 
+    def test_redirect_cached_after_first_hit(self):
+        """Second redirect for the same code skips the lookup query."""
+        mapping = URLMapping.objects.create(
+            original_url="https://example.com/cached"
+        )
+        with self.assertNumQueries(2):
+            self.client.get(f'/{mapping.short_code}')
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/{mapping.short_code}')
+        self.assertEqual(response['Location'], 'https://example.com/cached')
+
+
+@override_settings(ACCESS_COUNT_FLUSH_INTERVAL=60)
+@patch('shortener.counters._start_flusher')
+class AccessCounterTests(TestCase):
+    """Tests for buffered access count flushing."""
+
+    def setUp(self):
+        counters._PENDING.clear()
+
+    def test_bump_is_buffered_until_flush(self, start_flusher):
+        """Bumps don't touch the DB until flush() runs."""
+        mapping = URLMapping.objects.create(original_url="https://example.com")
+        with self.assertNumQueries(0):
+            mapping.increment_access_count()
+            mapping.increment_access_count()
+        mapping.refresh_from_db()
+        self.assertEqual(mapping.access_count, 0)
+
+        counters.flush()
+        mapping.refresh_from_db()
+        self.assertEqual(mapping.access_count, 2)
+
+    def test_flush_batches_rows_into_one_update(self, start_flusher):
+        """Pending counts for several rows go out in a single UPDATE."""
+        m1 = URLMapping.objects.create(original_url="https://example.com/1")
+        m2 = URLMapping.objects.create(original_url="https://example.com/2")
+        for _ in range(3):
+            counters.bump(m1.pk)
+        counters.bump(m2.pk)
+
+        with self.assertNumQueries(1):
+            counters.flush()
+        m1.refresh_from_db()
+        m2.refresh_from_db()
+        self.assertEqual(m1.access_count, 3)
+        self.assertEqual(m2.access_count, 1)
+        self.assertFalse(counters._PENDING)
+
+
+class FastPathParityTests(TestCase):
+    """Hand-rolled shorten validation/output must match the DRF serializers."""
+
+    def test_validation_matches_serializer(self):
+        """Same cleaned value or same errors as ShortenURLRequestSerializer."""
+        cases = [
+            {'url': '  https://example.com/a  '},
+            {'url': 'not-a-valid-url'},
+            {'url': 'ftp://example.com'},
+            {'url': 'http://10.0.0.1/'},
+            {'url': ''},
+            {'url': None},
+            {'url': ['https://example.com']},
+            {'url': 'https://example.com/' + 'a' * 2048},
+            {'url': 'https://example.com/\ud800'},
+            {'url': 'https://example.com/a\u0000b'},
+            {'url': 'https://example.com/' + '\u65e5' * 1000},
+            {},
+            ['https://example.com'],
+        ]
+        for data in cases:
+            serializer = ShortenURLRequestSerializer(data=data)
+            try:
+                url = validate_shorten_request(data)
+            except ValidationError as e:
+                self.assertFalse(serializer.is_valid(), data)
+                self.assertEqual(e.detail, serializer.errors, data)
+            else:
+                self.assertTrue(serializer.is_valid(), data)
+                self.assertEqual(url, serializer.validated_data['url'])
+
+    def test_response_data_matches_serializer(self):
+        """shorten_response_data renders like ShortenURLResponseSerializer."""
+        mapping = URLMapping.objects.create(original_url="https://example.com")
+        request = RequestFactory().post('/shorten')
+        expected = ShortenURLResponseSerializer(mapping, context={'request': request}).data
+        self.assertEqual(shorten_response_data(mapping, request), expected)
+
+    def test_short_url_matches_build_absolute_uri(self):
+        """Cached scheme+host prefix gives the same URL as build_absolute_uri."""
+        request = RequestFactory().get('/', secure=True, HTTP_HOST='sho.rt:8443')
+        self.assertEqual(
+            short_url_for(request, 'Ab3_-9'),
+            request.build_absolute_uri('/Ab3_-9')
+        )
+        self.assertEqual(short_url_for(request, 'xyz'), 'https://sho.rt:8443/xyz')
+        self.assertEqual(short_url_for(None, 'xyz'), '/xyz')
+
 
 class HealthCheckViewTests(APITestCase):
     """Tests for GET /health endpoint."""
@@ -241,6 +523,7 @@ class URLStatsViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+@override_settings(ACCESS_COUNT_FLUSH_INTERVAL=0)
 class EdgeCaseTests(APITestCase):
     """Tests for edge cases and special scenarios."""
 
@@ -255,6 +538,16 @@ class EdgeCaseTests(APITestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_url_over_byte_limit_rejected(self):
+        """Multi-byte URLs over URL_MAX_BYTES are rejected even under 2048 chars."""
+        response = self.client.post(
+            '/shorten',
+            {'url': 'https://example.com/' + '日' * 1000},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('url', response.data)
+
     def test_url_with_special_characters(self):
         """URLs with special characters are handled."""
         special_url = 'https://example.com/path?query=value&foo=bar#section'
@@ -280,6 +573,48 @@ class EdgeCaseTests(APITestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    @override_settings(RATE_LIMIT_REQUESTS=100)
+    def test_private_ip_urls_rejected(self):
+        """URLs pointing at private, loopback or link-local IPs are rejected."""
+        for url in ['http://10.1.2.3/', 'http://172.20.0.1/', 'http://192.168.0.10:8080/',
+                    'http://127.0.0.2/', 'http://169.254.169.254/latest',
+                    'http://100.64.0.1/']:
+            response = self.client.post('/shorten', {'url': url}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, url)
+
+    def test_public_ip_url_allowed(self):
+        """URLs with public IP hosts are accepted."""
+        response = self.client.post(
+            '/shorten',
+            {'url': 'http://8.8.8.8/'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_rate_limit_keyed_on_first_forwarded_ip(self):
+        """First X-Forwarded-For hop is used as the client IP."""
+        self.client.post(
+            '/shorten',
+            {'url': 'https://example.com'},
+            format='json',
+            HTTP_X_FORWARDED_FOR='203.0.113.9, 10.0.0.1'
+        )
+        self.assertTrue(RateLimitRecord.objects.filter(ip_address='203.0.113.9').exists())
+
+    def test_malformed_forwarded_ip_ignored(self):
+        """Garbage X-Forwarded-For falls back to REMOTE_ADDR."""
+        self.client.post(
+            '/shorten',
+            {'url': 'https://example.com'},
+            format='json',
+            HTTP_X_FORWARDED_FOR='not-an-ip',
+            REMOTE_ADDR='198.51.100.4'
+        )
+        self.assertEqual(
+            list(RateLimitRecord.objects.values_list('ip_address', flat=True)),
+            ['198.51.100.4']
+        )
+
     def test_multiple_ips_independent_rate_limits(self):
         """Different IPs have independent rate limits."""
         RateLimitRecord.objects.all().delete()
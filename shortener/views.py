@@ -1,18 +1,99 @@
 import logging
+import threading
+import time
+from collections import OrderedDict
 
-from django.http import HttpResponseRedirect
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404
-from django.db import DatabaseError, IntegrityError
+from django.views import View
+from django.db import DatabaseError, IntegrityError, transaction
 from rest_framework import status
+from rest_framework.exceptions import ParseError, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from . import counters
 from .models import URLMapping
-from .serializers import ShortenURLRequestSerializer, ShortenURLResponseSerializer
-from .rate_limiter import check_rate_limit, get_rate_limit_headers
+from .serializers import shorten_response_data, validate_shorten_request
+from .rate_limiter import check_rate_limit, get_rate_limit_headers, uses_db_backend
 
 logger = logging.getLogger(__name__)
 
+# short_code -> (pk, original_url, cached_at). Mappings never change once
+# created, so a short TTL only bounds staleness after admin edits.
+URL_CACHE_TTL = 300
+URL_CACHE_MAX_SIZE = 10_000
+_URL_CACHE = OrderedDict()
+_URL_CACHE_LOCK = threading.Lock()
+
+
+# Cache-Control value for redirects built from REDIRECT_CACHE_MAX_AGE,
+# read once instead of per redirect ('' = no header)
+_REDIRECT_CACHE_CONTROL = [None]
+
+
+def _get_redirect_cache_control():
+    value = _REDIRECT_CACHE_CONTROL[0]
+    if value is None:
+        max_age = getattr(settings, 'REDIRECT_CACHE_MAX_AGE', 0)
+        value = _REDIRECT_CACHE_CONTROL[0] = f'private, max-age={max_age}' if max_age else ''
+    return value
+
+
+@receiver(setting_changed)
+def _reset_redirect_cache_control(setting, **kwargs):
+    # keeps override_settings working in tests
+    if setting == 'REDIRECT_CACHE_MAX_AGE':
+        _REDIRECT_CACHE_CONTROL[0] = None
+
+
+def _url_cache_key(short_code):
+    return f"url:{short_code}"
+
+
+def resolve_short_code(short_code):
+    """
+    Look up (pk, original_url) for a short code.
+    Checks the in-process LRU first, then the shared Django cache, then the DB.
+    """
+    now = time.monotonic()
+    with _URL_CACHE_LOCK:
+        hit = _URL_CACHE.get(short_code)
+        if hit is not None:
+            if now - hit[2] < URL_CACHE_TTL:
+                _URL_CACHE.move_to_end(short_code)
+                return hit[0], hit[1]
+            del _URL_CACHE[short_code]
+
+    # the shared tier is only an optimisation, so fail open if it's down
+    try:
+        entry = cache.get(_url_cache_key(short_code))
+    except Exception as e:
+        logger.warning(f"URL cache get failed: {e}")
+        entry = None
+    if entry is None:
+        # plain tuple row, no model instance to build
+        try:
+            entry = URLMapping.objects.values_list('pk', 'original_url').get(
+                short_code=short_code
+            )
+        except URLMapping.DoesNotExist:
+            raise Http404
+        try:
+            cache.set(_url_cache_key(short_code), entry, URL_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"URL cache set failed: {e}")
+
+    with _URL_CACHE_LOCK:
+        _URL_CACHE[short_code] = (entry[0], entry[1], now)
+        if len(_URL_CACHE) > URL_CACHE_MAX_SIZE:
+            _URL_CACHE.popitem(last=False)
+    return entry
+
 
 class HealthCheckView(APIView):
     """Simple health check for monitoring."""
@@ -29,48 +110,55 @@ class ShortenURLView(APIView):
     permission_classes = []
 
     def post(self, request):
+        if uses_db_backend():
+            # rate limit update and insert ride one connection and commit once
+            with transaction.atomic():
+                return self._shorten(request)
+        # with Redis the 429 path never touches the DB
+        return self._shorten(request)
+
+    def _shorten(self, request):
         # check rate limit first
         rl_result = check_rate_limit(request)
         rl_headers = get_rate_limit_headers(rl_result)
         
         if not rl_result.allowed:
-            resp = Response(
+            return Response(
                 {
                     'error': 'Rate limit exceeded',
                     'detail': 'Too many requests. Please try again later.',
                     'retry_after': rl_result.retry_after
                 },
-                status=status.HTTP_429_TOO_MANY_REQUESTS
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers=rl_headers
             )
-            for k, v in rl_headers.items():
-                resp[k] = v
-            return resp
         
-        serializer = ShortenURLRequestSerializer(data=request.data)
-        if not serializer.is_valid():
-            resp = Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-            for k, v in rl_headers.items():
-                resp[k] = v
-            return resp
+        # parse errors must not escape, or the atomic block would roll back
+        # the rate limit increment
+        try:
+            data = request.data
+        except ParseError as e:
+            return Response(
+                {'detail': e.detail}, status=status.HTTP_400_BAD_REQUEST, headers=rl_headers
+            )
+
+        try:
+            url = validate_shorten_request(data)
+        except ValidationError as e:
+            return Response(
+                e.detail, status=status.HTTP_400_BAD_REQUEST, headers=rl_headers
+            )
         
         # create the mapping
         try:
-            url_mapping = URLMapping.objects.create(
-                original_url=serializer.validated_data['url']
-            )
+            url_mapping = URLMapping.objects.create(original_url=url)
         except IntegrityError:
-            # rare collision, try once more
-            logger.warning("Short code collision, retrying")
-            try:
-                url_mapping = URLMapping.objects.create(
-                    original_url=serializer.validated_data['url']
-                )
-            except IntegrityError:
-                logger.error("Failed to create URL after retry")
-                return Response(
-                    {'error': 'Could not generate short code. Try again.'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+            # save() already retried with fresh codes
+            logger.error("Failed to generate a unique short code")
+            return Response(
+                {'error': 'Could not generate short code. Try again.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
         except DatabaseError as e:
             logger.error(f"DB error: {e}")
             return Response(
@@ -78,22 +166,39 @@ class ShortenURLView(APIView):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
         
-        out = ShortenURLResponseSerializer(url_mapping, context={'request': request})
-        resp = Response(out.data, status=status.HTTP_201_CREATED)
-        for k, v in rl_headers.items():
-            resp[k] = v
-        return resp
+        return Response(
+            shorten_response_data(url_mapping, request),
+            status=status.HTTP_201_CREATED,
+            headers=rl_headers
+        )
 
 
-class RedirectView(APIView):
-    """Redirect short code to original URL."""
-    authentication_classes = []
-    permission_classes = []
+class RedirectView(View):
+    """
+    Redirect short code to original URL.
+    Plain Django view - this is the hottest endpoint and needs none of DRF's
+    negotiation/auth/throttle machinery.
+    """
 
     def get(self, request, short_code):
-        url_mapping = get_object_or_404(URLMapping, short_code=short_code)
-        url_mapping.increment_access_count()
-        return HttpResponseRedirect(url_mapping.original_url)
+        # same bodies the DRF views get from custom_exception_handler
+        try:
+            pk, original_url = resolve_short_code(short_code)
+            counters.bump(pk)
+        except Http404:
+            return JsonResponse({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        except DatabaseError as e:
+            logger.error(f"DB error: {e}")
+            return JsonResponse(
+                {'error': 'Database unavailable'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        resp = HttpResponseRedirect(original_url)
+        cache_control = _get_redirect_cache_control()
+        if cache_control:
+            # repeat clicks are served by the browser, so access_count undercounts them
+            resp['Cache-Control'] = cache_control
+        return resp
 
 
 class URLStatsView(APIView):
@@ -102,7 +207,10 @@ class URLStatsView(APIView):
     permission_classes = []
 
     def get(self, request, short_code):
-        mapping = get_object_or_404(URLMapping, short_code=short_code)
+        mapping = get_object_or_404(
+            URLMapping.objects.only('short_code', 'original_url', 'created_at', 'access_count'),
+            short_code=short_code
+        )
         return Response({
             'short_code': mapping.short_code,
             'original_url': mapping.original_url,